@@ -1,12 +1,19 @@
 import argparse
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import orjson
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-import pytz
+from lxml import etree
+from bs4 import BeautifulSoup, SoupStrainer
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 import os
+import random
 import re
 import logging
-from apscheduler.schedulers.blocking import BlockingScheduler
+import time
 
 # --- LOGGING CONFIGURATION ---
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
@@ -29,7 +36,84 @@ FETCH_RETRY_COUNT = int(os.environ.get("FETCH_RETRY_COUNT", "3"))
 FETCH_RETRY_DELAY_SECONDS = int(os.environ.get("FETCH_RETRY_DELAY_SECONDS", "5"))
 
 # Quebec Timezone (for local timestamps)
-QUEBEC_TZ = pytz.timezone("America/Montreal")
+QUEBEC_TZ = ZoneInfo("America/Montreal")
+# HNE is fixed UTC-5 (no DST), used when the table header advertises HNE times
+HNE_TZ = timezone(timedelta(hours=-5))
+
+# Strips everything but digits and decimal separators from table cells;
+# str.translate runs a plain C loop, cheaper than a regex FSM on tiny strings
+_NUM_KEEP = str.maketrans(
+    "", "", "".join(chr(c) for c in range(256) if chr(c) not in "0123456789,.")
+)
+
+# Matches the station-title paragraph; bs4 runs compiled patterns in C and,
+# unlike a lambda, they never blow up on tags without a string
+_STATION_TITLE_RE = re.compile(r"Niveau d'eau et débit à la station")
+
+# Runs the two independent HA state POSTs in parallel
+_HA_POST_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+# Station id/name and units are static per station; re-derive once a day
+# instead of walking the soup for them on every tick
+STATION_META_TTL_SECONDS = 24 * 3600
+_STATION_META_CACHE = {}
+
+# Last (table timestamp, height, flow) posted per station; CEHQ publishes
+# every ~15 minutes while we poll every 10, so many ticks see no change
+_LAST_POSTED = {}
+
+# Cache validators (Last-Modified/ETag) plus the matching parsed data per
+# URL, enabling conditional GETs against CEHQ. Persisted to disk (next to
+# ha_token.txt) so conditional GETs work from the first tick after a restart.
+CONDITIONAL_CACHE_FILE = os.environ.get(
+    "CONDITIONAL_CACHE_FILE",
+    os.path.join(os.path.dirname(__file__), "http_cache.json"),
+)
+_CONDITIONAL_CACHE = {}
+_conditional_cache_loaded = False
+
+
+def _get_conditional_entry(data_url):
+    global _conditional_cache_loaded
+    if not _conditional_cache_loaded:
+        _conditional_cache_loaded = True
+        try:
+            with open(CONDITIONAL_CACHE_FILE, "rb") as f:
+                _CONDITIONAL_CACHE.update(orjson.loads(f.read()))
+        except FileNotFoundError:
+            pass
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.debug("Could not load conditional cache: %s", e)
+    return _CONDITIONAL_CACHE.get(data_url)
+
+
+def _store_conditional_cache(data_url, response_headers, parsed_data):
+    last_modified = response_headers.get("Last-Modified")
+    etag = response_headers.get("ETag")
+    if last_modified or etag:
+        _CONDITIONAL_CACHE[data_url] = {
+            "last_modified": last_modified,
+            "etag": etag,
+            "parsed": parsed_data,
+        }
+        try:
+            with open(CONDITIONAL_CACHE_FILE, "wb") as f:
+                f.write(orjson.dumps(_CONDITIONAL_CACHE))
+        except OSError as e:
+            logger.debug("Could not persist conditional cache: %s", e)
+
+
+# Only the data table, the station-number span and the station-name paragraph
+# are ever read from the page; skip building the rest of the DOM.
+PARSE_ONLY_STRAINER = SoupStrainer(["table", "span", "p"])
+
+# Finds the Date/Heure/Niveau/Débit header row in a single soupsieve pass
+HEADER_ROW_SELECTOR = (
+    'table tr:has(> td:nth-of-type(1) font:-soup-contains("Date"))'
+    ':has(> td:nth-of-type(2) font:-soup-contains("Heure"))'
+    ':has(> td:nth-of-type(3) font:-soup-contains("Niveau"))'
+    ':has(> td:nth-of-type(4) font:-soup-contains("Débit"))'
+)
 
 
 # --- Helper function to load the token ---
@@ -54,7 +138,7 @@ def load_ha_token():
                 token = f.read().strip()
                 if not token:
                     raise ValueError("Token file is empty.")
-                logger.info(f"Using HA token from file: {candidate_path}")
+                logger.info("Using HA token from file: %s", candidate_path)
                 return token
     except FileNotFoundError:
         logger.error(
@@ -65,11 +149,11 @@ def load_ha_token():
         )
         exit(1)
     except ValueError as e:
-        logger.error(f"Error reading token from file: {e}")
+        logger.error("Error reading token from file: %s", e)
         logger.error("Please ensure the token file contains a valid token.")
         exit(1)
     except Exception as e:
-        logger.error(f"An unexpected error occurred while loading token: {e}")
+        logger.error("An unexpected error occurred while loading token: %s", e)
         exit(1)
 
 
@@ -115,31 +199,167 @@ def parse_args():
     return parser.parse_args()
 
 
+class RuntimeConfig(NamedTuple):
+    """Immutable per-process configuration derived from CLI args/env."""
+
+    station_number: str
+    data_url: str
+    ha_api_base_url: str
+    station_name_prefix: str
+    river_name_override: str
+    river_name_fallback: str
+    ha_flow_entity_id: str
+    ha_height_entity_id: str
+
+
 def build_runtime_config(args):
     station_number = args.station_number.strip()
     data_url = args.data_url
     if not data_url:
         data_url = DEFAULT_DATA_URL_TEMPLATE.format(station_number=station_number)
-    ha_api_base_url = args.ha_api_base_url.strip()
-    station_name_prefix = args.station_name_prefix.strip()
-    river_name_override = args.river_name.strip() if args.river_name else ""
-    river_name_fallback = args.river_name_fallback.strip()
-    ha_flow_entity_id = f"sensor.station_{station_number}_flow_rate"
-    ha_height_entity_id = f"sensor.station_{station_number}_height_level"
-    return {
-        "station_number": station_number,
-        "data_url": data_url,
-        "ha_api_base_url": ha_api_base_url,
-        "station_name_prefix": station_name_prefix,
-        "river_name_override": river_name_override,
-        "river_name_fallback": river_name_fallback,
-        "ha_flow_entity_id": ha_flow_entity_id,
-        "ha_height_entity_id": ha_height_entity_id,
+    return RuntimeConfig(
+        station_number=station_number,
+        data_url=data_url,
+        ha_api_base_url=args.ha_api_base_url.strip(),
+        station_name_prefix=args.station_name_prefix.strip(),
+        river_name_override=args.river_name.strip() if args.river_name else "",
+        river_name_fallback=args.river_name_fallback.strip(),
+        ha_flow_entity_id=f"sensor.station_{station_number}_flow_rate",
+        ha_height_entity_id=f"sensor.station_{station_number}_height_level",
+    )
+
+
+def build_http_session():
+    """Build a Session with keep-alive pooling for the CEHQ and HA hosts."""
+    session = requests.Session()
+    # Advertise compression explicitly; gzip shrinks the CEHQ table page
+    # several-fold. br is left out since no brotli decoder is installed.
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _iterparse_first_data_row(content):
+    """Early-exit scan for the first data row after the table header.
+
+    Walks ``tr`` elements one at a time with lxml's iterparse instead of
+    building a full document tree, and stops as soon as the row following
+    the Date/Heure/Niveau/Débit header has been read. Returns a tuple of
+    ``(cell_texts, is_hne)`` or ``None`` when the expected structure is not
+    found, in which case the caller falls back to the full soup parse.
+    """
+    try:
+        context = etree.iterparse(
+            io.BytesIO(content), events=("end",), tag="tr", html=True
+        )
+        header_seen = False
+        is_hne = False
+        for _event, tr in context:
+            if not header_seen:
+                font_texts = [
+                    " ".join(t.strip() for t in td.xpath(".//font//text()")).replace(
+                        "\xa0", " "
+                    )
+                    for td in tr.findall("td")[:4]
+                ]
+                if (
+                    len(font_texts) == 4
+                    and "Date" in font_texts[0]
+                    and "Heure" in font_texts[1]
+                    and "Niveau" in font_texts[2]
+                    and "Débit" in font_texts[3]
+                ):
+                    header_seen = True
+                    is_hne = "HNE" in font_texts[1]
+            else:
+                cells = tr.findall("td")
+                if len(cells) < 4:
+                    return None
+                cell_texts = ["".join(td.itertext()) for td in cells[:4]]
+                return cell_texts, is_hne
+            tr.clear()
+    except etree.XMLSyntaxError:
+        return None
+    return None
+
+
+def _build_parsed_data(raw_cells, is_hne, station_meta):
+    """Turns the four raw cell texts plus cached station metadata into the
+    payload dict consumed by send_to_home_assistant."""
+    date_str = raw_cells[0].strip().replace("\xa0", "")
+    time_str = raw_cells[1].strip().replace("\xa0", "")
+
+    height_str = raw_cells[2].strip().translate(_NUM_KEEP)
+    if height_str.count(",") == 1 and height_str.count(".") == 0:
+        height_str = height_str.replace(",", ".")
+
+    flow_str = raw_cells[3].strip().translate(_NUM_KEEP)
+    if flow_str.count(",") == 1 and flow_str.count(".") == 0:
+        flow_str = flow_str.replace(",", ".")
+
+    # --- UPDATED TIMEZONE HANDLING ---
+    # The table always uses fixed-width "YYYY-MM-DD" / "HH:MM:SS"; slicing
+    # plus int() is several times faster than a strptime format walk
+    datetime_naive = datetime(
+        int(date_str[0:4]),
+        int(date_str[5:7]),
+        int(date_str[8:10]),
+        int(time_str[0:2]),
+        int(time_str[3:5]),
+        int(time_str[6:8]),
+    )
+
+    if is_hne:
+        # Table is in HNE (UTC-5), convert to Montreal (which handles EDT/HAE correctly)
+        datetime_aware_hne = datetime_naive.replace(tzinfo=HNE_TZ)
+        datetime_aware_local_quebec = datetime_aware_hne.astimezone(QUEBEC_TZ)
+        logger.debug("Adjusted HNE time to local Quebec time.")
+    else:
+        # Fallback to current system logic
+        datetime_aware_local_quebec = datetime_naive.replace(tzinfo=QUEBEC_TZ)
+
+    datetime_utc = datetime_aware_local_quebec.astimezone(timezone.utc)
+    # ---------------------------------
+
+    station_name = station_meta["station_name"]
+    height_val = float(height_str)
+    flow_val = float(flow_str)
+
+    parsed_data = {
+        "height": height_val,
+        "flow": flow_val,
+        "station_id": station_meta["station_id"],
+        "station_name": station_name,
+        "timestamp_from_table_local": datetime_aware_local_quebec.isoformat(),
+        "timestamp_from_table_utc": datetime_utc.isoformat(),
+        "flow_unit_of_measurement": station_meta["flow_unit"],
+        "height_unit_of_measurement": station_meta["height_unit"],
+        "flow_friendly_name": f"{station_name} - Débit Actuel",
+        "height_friendly_name": f"{station_name} - Niveau Actuel",
+        "flow_icon": "mdi:water-sync",
+        "height_icon": "mdi:ruler",
+        "flow_device_class": "volume_flow_rate",
+        "height_device_class": "water",
+        "flow_state_class": "measurement",
+        "height_state_class": "measurement",
     }
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Successfully parsed data: Date=%s, Time=%s, Height=%sm, Flow=%sm³/s (HNE Identified: %s)",
+            date_str,
+            time_str,
+            height_val,
+            flow_val,
+            is_hne,
+        )
+    return parsed_data
 
 
 # --- HELPER FUNCTION FOR DATA FETCHING AND PARSING ---
 def fetch_and_parse_data(
+    session,
     data_url,
     station_number,
     station_name_prefix,
@@ -147,82 +367,95 @@ def fetch_and_parse_data(
     river_name_fallback,
 ):
     """Fetches the HTML, parses the table, and returns the latest data."""
-    logger.debug(f"Fetching data from {data_url}...")
+    logger.debug("Fetching data from %s...", data_url)
     response = None
+
+    # Revalidate with the server when it gave us cache validators; a 304
+    # means no new reading was published and skips the download and parse.
+    conditional = _get_conditional_entry(data_url)
+    request_headers = {}
+    if conditional:
+        if conditional["last_modified"]:
+            request_headers["If-Modified-Since"] = conditional["last_modified"]
+        if conditional["etag"]:
+            request_headers["If-None-Match"] = conditional["etag"]
+
     for attempt in range(1, FETCH_RETRY_COUNT + 1):
         try:
-            response = requests.get(data_url, timeout=15)
+            response = session.get(
+                data_url, headers=request_headers or None, timeout=15
+            )
+            if response.status_code == 304:
+                logger.debug("CEHQ page not modified; reusing last parsed data.")
+                return conditional["parsed"]
             response.raise_for_status()
             break
         except requests.exceptions.RequestException as e:
             if attempt < FETCH_RETRY_COUNT:
+                # Exponential backoff with a little jitter so retries do not
+                # line up with an upstream brownout.
+                delay = FETCH_RETRY_DELAY_SECONDS * 2 ** (attempt - 1) + random.uniform(
+                    0, 0.5
+                )
                 logger.warning(
-                    "Error fetching data (attempt %s/%s): %s. Retrying in %ss...",
+                    "Error fetching data (attempt %s/%s): %s. Retrying in %.1fs...",
                     attempt,
                     FETCH_RETRY_COUNT,
                     e,
-                    FETCH_RETRY_DELAY_SECONDS,
+                    delay,
                 )
-                try:
-                    import time
-
-                    time.sleep(FETCH_RETRY_DELAY_SECONDS)
-                except Exception:
-                    pass
+                time.sleep(delay)
             else:
                 logger.error(
                     "Error fetching data after %s attempts: %s", FETCH_RETRY_COUNT, e
                 )
                 return None
 
-    response.encoding = "utf-8"
-    soup = BeautifulSoup(response.text, "html.parser")
+    cached_meta = _STATION_META_CACHE.get(station_number)
+    if (
+        cached_meta is not None
+        and time.monotonic() - cached_meta["cached_at"] >= STATION_META_TTL_SECONDS
+    ):
+        cached_meta = None
+
+    # With cached metadata only the first data row is needed, so try the
+    # cheap early-exit scan before paying for a full soup parse.
+    if cached_meta is not None:
+        fast_result = _iterparse_first_data_row(response.content)
+        if fast_result is not None:
+            raw_cells, is_hne = fast_result
+            try:
+                parsed_data = _build_parsed_data(raw_cells, is_hne, cached_meta)
+            except (IndexError, ValueError, AttributeError) as e:
+                logger.error("Error parsing data from table row or cell: %s", e)
+                return None
+            _store_conditional_cache(data_url, response.headers, parsed_data)
+            return parsed_data
+
+    soup = BeautifulSoup(response.content, "lxml", parse_only=PARSE_ONLY_STRAINER)
 
-    data_table = None
-    header_row = None
+    # One C-level soupsieve traversal replaces the old Python loop over
+    # every table, row and cell looking for the header keywords.
+    header_row = soup.select_one(HEADER_ROW_SELECTOR)
     is_hne = False  # Track if we found HNE in the header
 
-    tables = soup.find_all("table")
-
-    for table in tables:
-        potential_header_rows = table.find_all("tr", recursive=False)
-        for row in potential_header_rows:
-            td_elements = row.find_all("td")
-            if len(td_elements) >= 4:
-                header_texts_from_font_tags = []
-                for td_idx in [0, 1, 2, 3]:
-                    font_tag = td_elements[td_idx].find("font")
-                    if font_tag:
-                        # Use separator=" " to catch (HNE) if it's on a new line inside the font tag
-                        text_content = font_tag.get_text(
-                            separator=" ", strip=True
-                        ).replace("\xa0", " ")
-                        header_texts_from_font_tags.append(text_content)
-                    else:
-                        header_texts_from_font_tags.append("NO FONT TAG FOUND")
+    if header_row is None:
+        logger.error("Could not find the main data table or its header row.")
+        return None
 
-                if (
-                    "Date" in header_texts_from_font_tags[0]
-                    and "Heure" in header_texts_from_font_tags[1]
-                    and "Niveau" in header_texts_from_font_tags[2]
-                    and "Débit" in header_texts_from_font_tags[3]
-                ):
-                    header_row = row
-                    data_table = table
-                    # Check if "HNE" appears in the time column header
-                    if "HNE" in header_texts_from_font_tags[1]:
-                        is_hne = True
-                    break
-        if data_table:
-            break
+    data_table = header_row.find_parent("table")
+
+    # Check if "HNE" appears in the time column header; use separator=" " to
+    # catch (HNE) if it's on a new line inside the font tag
+    heure_font_tag = header_row.find_all("td")[1].find("font")
+    if heure_font_tag and "HNE" in heure_font_tag.get_text(separator=" ", strip=True):
+        is_hne = True
 
-    if not data_table or not header_row:
+    if not data_table:
         logger.error("Could not find the main data table or its header row.")
         return None
 
-    data_rows = data_table.find_all("tr")[
-        data_table.find_all("tr").index(header_row) + 1 :
-    ]
+    data_rows = header_row.find_next_siblings("tr")
 
     if not data_rows:
         logger.error("No data rows found in the table after skipping header.")
@@ -232,225 +465,217 @@ def fetch_and_parse_data(
     cells = latest_row.find_all("td")
 
     if len(cells) < 4:
-        logger.error(f"Not enough cells found. Expected at least 4, got {len(cells)}")
+        logger.error("Not enough cells found. Expected at least 4, got %s", len(cells))
         return None
 
     try:
-        date_str = cells[0].text.strip().replace("\xa0", "")
-        time_str = cells[1].text.strip().replace("\xa0", "")
-
-        height_str = cells[2].text.replace("\xa0", "").strip()
-        height_str = re.sub(r"[^0-9,\.]", "", height_str)
-        if height_str.count(",") == 1 and height_str.count(".") == 0:
-            height_str = height_str.replace(",", ".")
-
-        flow_str = cells[3].text.replace("\xa0", "").strip()
-        flow_str = re.sub(r"[^0-9,\.]", "", flow_str)
-        if flow_str.count(",") == 1 and flow_str.count(".") == 0:
-            flow_str = flow_str.replace(",", ".")
-
-        # --- UPDATED TIMEZONE HANDLING ---
-        datetime_naive = datetime.strptime(
-            f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S"
-        )
-
-        if is_hne:
-            # Table is in HNE (UTC-5), convert to Montreal (which handles EDT/HAE correctly)
-            hne_tz = pytz.FixedOffset(-300)
-            datetime_aware_hne = hne_tz.localize(datetime_naive)
-            datetime_aware_local_quebec = datetime_aware_hne.astimezone(QUEBEC_TZ)
-            logger.debug("Adjusted HNE time to local Quebec time.")
-        else:
-            # Fallback to current system logic
-            datetime_aware_local_quebec = QUEBEC_TZ.localize(datetime_naive)
-
-        datetime_utc = datetime_aware_local_quebec.astimezone(pytz.utc)
-        # ---------------------------------
-
-        # Extract station ID
-        station_name_tag = soup.find("span", id="spnNoStation")
-        station_id = (
-            station_name_tag.text.strip() if station_name_tag else station_number
-        )
-
-        # Construct station_name as "<Prefix> - <Station> - <River>"
-        if river_name_override:
-            river_designation = river_name_override
-        else:
-            river_designation = river_name_fallback
-            station_name_full_text_element = soup.find(
-                "p",
-                align="center",
-                class_=None,
-                string=lambda s: "Niveau d'eau et débit à la station" in s,
+        raw_cells = [cells[idx].text for idx in range(4)]
+
+        # Station identity and units never change between ticks for a given
+        # station; derive them from the soup once and reuse them afterwards.
+        if cached_meta is None:
+            # Extract station ID
+            station_name_tag = soup.find("span", id="spnNoStation")
+            station_id = (
+                station_name_tag.text.strip() if station_name_tag else station_number
             )
-            if station_name_full_text_element:
-                full_text = station_name_full_text_element.get_text(strip=True)
-                parts_after_id = full_text.split(station_id)
-                if len(parts_after_id) > 1:
-                    potential_river_part = parts_after_id[1].strip()
-                    if " - " in potential_river_part:
-                        river_designation = potential_river_part.split(" - ")[
-                            -1
-                        ].strip()
-
-        if station_name_prefix:
-            station_name = f"{station_name_prefix} - {station_id} - {river_designation}"
-        else:
-            station_name = f"{station_id} - {river_designation}"
-
-        height_unit = ""
-        flow_unit = ""
-
-        header_tds_for_units = header_row.find_all("td")
-
-        # Height Unit
-        if len(header_tds_for_units) > 2:
-            height_font_tag = header_tds_for_units[2].find("font")
-            if height_font_tag:
-                height_unit_raw = height_font_tag.get_text(strip=True).replace(
-                    "\xa0", " "
+
+            # Construct station_name as "<Prefix> - <Station> - <River>"
+            if river_name_override:
+                river_designation = river_name_override
+            else:
+                river_designation = river_name_fallback
+                station_name_full_text_element = soup.find(
+                    "p",
+                    align="center",
+                    class_=None,
+                    string=_STATION_TITLE_RE,
                 )
-                if "(m)" in height_unit_raw or "m" == height_unit_raw.lower():
-                    height_unit = "m"
-                elif "m" in height_unit_raw and "Niveau" in height_unit_raw:
-                    height_unit = "m"
-
-        # Flow Unit
-        if len(header_tds_for_units) > 3:
-            flow_font_tag = header_tds_for_units[3].find("font")
-            if flow_font_tag:
-                flow_unit_raw = flow_font_tag.get_text(strip=True).replace("\xa0", " ")
-                if "(m³/s)" in flow_unit_raw or "m³/s" == flow_unit_raw:
-                    flow_unit = "m³/s"
-                elif "m3/s" in flow_unit_raw:
-                    flow_unit = "m³/s"
-
-        parsed_data = {
-            "height": float(height_str),
-            "flow": float(flow_str),
-            "station_id": station_id,
-            "station_name": station_name,
-            "timestamp_from_table_local": datetime_aware_local_quebec.isoformat(),
-            "timestamp_from_table_utc": datetime_utc.isoformat(),
-            "flow_unit_of_measurement": flow_unit,
-            "height_unit_of_measurement": height_unit,
-            "flow_friendly_name": f"{station_name} - Débit Actuel",
-            "height_friendly_name": f"{station_name} - Niveau Actuel",
-            "flow_icon": "mdi:water-sync",
-            "height_icon": "mdi:ruler",
-            "flow_device_class": "volume_flow_rate",
-            "height_device_class": "water",
-            "flow_state_class": "measurement",
-            "height_state_class": "measurement",
-        }
-        logger.info(
-            "Successfully parsed data: Date=%s, Time=%s, Height=%sm, Flow=%sm³/s (HNE Identified: %s)",
-            date_str,
-            time_str,
-            float(height_str),
-            float(flow_str),
-            is_hne,
-        )
+                if station_name_full_text_element:
+                    full_text = station_name_full_text_element.get_text(strip=True)
+                    parts_after_id = full_text.split(station_id)
+                    if len(parts_after_id) > 1:
+                        potential_river_part = parts_after_id[1].strip()
+                        if " - " in potential_river_part:
+                            river_designation = potential_river_part.split(" - ")[
+                                -1
+                            ].strip()
+
+            if station_name_prefix:
+                station_name = (
+                    f"{station_name_prefix} - {station_id} - {river_designation}"
+                )
+            else:
+                station_name = f"{station_id} - {river_designation}"
+
+            height_unit = ""
+            flow_unit = ""
+
+            header_tds_for_units = header_row.find_all("td")
+
+            # Height Unit
+            if len(header_tds_for_units) > 2:
+                height_font_tag = header_tds_for_units[2].find("font")
+                if height_font_tag:
+                    height_unit_raw = height_font_tag.get_text(strip=True).replace(
+                        "\xa0", " "
+                    )
+                    if "(m)" in height_unit_raw or "m" == height_unit_raw.lower():
+                        height_unit = "m"
+                    elif "m" in height_unit_raw and "Niveau" in height_unit_raw:
+                        height_unit = "m"
+
+            # Flow Unit
+            if len(header_tds_for_units) > 3:
+                flow_font_tag = header_tds_for_units[3].find("font")
+                if flow_font_tag:
+                    flow_unit_raw = flow_font_tag.get_text(strip=True).replace(
+                        "\xa0", " "
+                    )
+                    if "(m³/s)" in flow_unit_raw or "m³/s" == flow_unit_raw:
+                        flow_unit = "m³/s"
+                    elif "m3/s" in flow_unit_raw:
+                        flow_unit = "m³/s"
+
+            cached_meta = {
+                "station_id": station_id,
+                "station_name": station_name,
+                "height_unit": height_unit,
+                "flow_unit": flow_unit,
+                "cached_at": time.monotonic(),
+            }
+            _STATION_META_CACHE[station_number] = cached_meta
+
+        parsed_data = _build_parsed_data(raw_cells, is_hne, cached_meta)
+        _store_conditional_cache(data_url, response.headers, parsed_data)
         return parsed_data
 
     except (IndexError, ValueError, AttributeError) as e:
-        logger.error(f"Error parsing data from table row or cell: {e}")
+        logger.error("Error parsing data from table row or cell: %s", e)
         return None
 
 
 # --- REST OF THE SCRIPT (send_to_home_assistant and main block) ---
 def send_to_home_assistant(
-    data, ha_api_base_url, ha_headers, flow_entity_id, height_entity_id, source_url
+    session,
+    data,
+    ha_api_base_url,
+    ha_headers,
+    flow_entity_id,
+    height_entity_id,
+    source_url,
 ):
     """Sends the parsed data to Home Assistant via REST API."""
     if not data:
         logger.warning("No data to send to Home Assistant.")
         return
 
-    script_current_local_time = datetime.now(QUEBEC_TZ)
+    posted_key = (data["timestamp_from_table_utc"], data["height"], data["flow"])
+    if _LAST_POSTED.get(data["station_id"]) == posted_key:
+        logger.debug(
+            "Readings unchanged since last POST; skipping HA update for %s",
+            data["station_id"],
+        )
+        return
+
+    now_iso = datetime.now(QUEBEC_TZ).isoformat()
+    table_local_iso = data["timestamp_from_table_local"]
+
+    # ~90% of the attributes are identical between the two payloads; build
+    # the shared part once and overlay the entity-specific fields.
+    common_attrs = {
+        "timestamp": table_local_iso,
+        "last_updated": now_iso,
+        "last_changed": table_local_iso,
+        "station_id": data["station_id"],
+        "station_name": data["station_name"],
+        "source_url": source_url,
+    }
 
     flow_payload = {
         "state": data["flow"],
         "attributes": {
+            **common_attrs,
             "friendly_name": data["flow_friendly_name"],
             "unit_of_measurement": data["flow_unit_of_measurement"],
             "icon": data["flow_icon"],
             "device_class": data["flow_device_class"],
             "state_class": data["flow_state_class"],
-            "timestamp": data["timestamp_from_table_local"],
-            "last_updated": script_current_local_time.isoformat(),
-            "last_changed": data["timestamp_from_table_local"],
             "height_m": data["height"],
-            "station_id": data["station_id"],
-            "station_name": data["station_name"],
-            "source_url": source_url,
         },
     }
 
     height_payload = {
         "state": data["height"],
         "attributes": {
+            **common_attrs,
             "friendly_name": data["height_friendly_name"],
             "unit_of_measurement": data["height_unit_of_measurement"],
             "icon": data["height_icon"],
             "device_class": data["height_device_class"],
             "state_class": data["height_state_class"],
-            "timestamp": data["timestamp_from_table_local"],
-            "last_updated": script_current_local_time.isoformat(),
-            "last_changed": data["timestamp_from_table_local"],
             "flow_m3_s": data["flow"],
-            "station_id": data["station_id"],
-            "station_name": data["station_name"],
-            "source_url": source_url,
         },
     }
 
     flow_api_url = f"{ha_api_base_url}/states/{flow_entity_id}"
     height_api_url = f"{ha_api_base_url}/states/{height_entity_id}"
 
-    logger.debug(f"Sending data to Home Assistant REST API for {flow_entity_id}")
-    try:
-        response_flow = requests.post(
-            flow_api_url, json=flow_payload, headers=ha_headers, timeout=10
-        )
-        response_flow.raise_for_status()
-        logger.info(
-            f"River flow data successfully sent to HA. Status: {response_flow.status_code}"
-        )
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error sending river flow data to Home Assistant: {e}")
+    def post_state(label, api_url, payload):
+        logger.debug("Sending data to Home Assistant REST API for %s", api_url)
+        try:
+            # orjson serializes the payload in C; ha_headers already carries
+            # the application/json content type
+            response = session.post(
+                api_url, data=orjson.dumps(payload), headers=ha_headers, timeout=10
+            )
+            response.raise_for_status()
+            logger.info(
+                "River %s data successfully sent to HA. Status: %s",
+                label,
+                response.status_code,
+            )
+            return True
+        except requests.exceptions.RequestException as e:
+            logger.error("Error sending river %s data to Home Assistant: %s", label, e)
+            return False
 
-    logger.debug(f"Sending data to Home Assistant REST API for {height_entity_id}")
-    try:
-        response_height = requests.post(
-            height_api_url, json=height_payload, headers=ha_headers, timeout=10
-        )
-        response_height.raise_for_status()
-        logger.info(
-            f"River height data successfully sent to HA. Status: {response_height.status_code}"
-        )
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error sending river height data to Home Assistant: {e}")
+    # The two state updates are independent; POST them concurrently so we
+    # only pay one HA round-trip of latency instead of two.
+    flow_future = _HA_POST_EXECUTOR.submit(
+        post_state, "flow", flow_api_url, flow_payload
+    )
+    height_future = _HA_POST_EXECUTOR.submit(
+        post_state, "height", height_api_url, height_payload
+    )
+    flow_ok = flow_future.result()
+    height_ok = height_future.result()
+
+    # Only remember the readings once both POSTs landed, so a failed tick
+    # is retried in full on the next run.
+    if flow_ok and height_ok:
+        _LAST_POSTED[data["station_id"]] = posted_key
 
 
-def run_fetcher(runtime_config, ha_headers):
+def run_fetcher(session, runtime_config, ha_headers):
     """Execute fetch, parse, and send logic once."""
     parsed_data = fetch_and_parse_data(
-        runtime_config["data_url"],
-        runtime_config["station_number"],
-        runtime_config["station_name_prefix"],
-        runtime_config["river_name_override"],
-        runtime_config["river_name_fallback"],
+        session,
+        runtime_config.data_url,
+        runtime_config.station_number,
+        runtime_config.station_name_prefix,
+        runtime_config.river_name_override,
+        runtime_config.river_name_fallback,
     )
     if parsed_data:
         send_to_home_assistant(
+            session,
             parsed_data,
-            runtime_config["ha_api_base_url"],
+            runtime_config.ha_api_base_url,
             ha_headers,
-            runtime_config["ha_flow_entity_id"],
-            runtime_config["ha_height_entity_id"],
-            runtime_config["data_url"],
+            runtime_config.ha_flow_entity_id,
+            runtime_config.ha_height_entity_id,
+            runtime_config.data_url,
         )
     else:
         logger.warning(
@@ -461,14 +686,6 @@ def run_fetcher(runtime_config, ha_headers):
 if __name__ == "__main__":
     logger.info("Starting river data fetch script with embedded scheduler")
 
-    try:
-        import pytz
-    except ImportError:
-        logger.error(
-            "'pytz' library not found. Please install it using: pip3 install pytz"
-        )
-        exit(1)
-
     args = parse_args()
     runtime_config = build_runtime_config(args)
 
@@ -478,25 +695,19 @@ if __name__ == "__main__":
         "Content-Type": "application/json",
     }
 
+    # Shared session keeps CEHQ/HA connections alive across scheduler ticks
+    session = build_http_session()
+
     # Get interval from env variable (in minutes, default 10)
     interval_minutes = int(os.environ.get("FETCHER_INTERVAL_MINUTES", "10"))
 
-    # Set up scheduler with timezone from environment
-    scheduler = BlockingScheduler(timezone=QUEBEC_TZ)
-    scheduler.add_job(
-        run_fetcher,
-        "interval",
-        minutes=interval_minutes,
-        args=[runtime_config, ha_headers],
-        id="fetcher_job",
-    )
-
-    logger.info(f"Scheduled fetcher to run every {interval_minutes} minutes")
-    logger.info("Scheduler starting...")
-
-    # Run initial fetch immediately
-    logger.info("Running initial fetch...")
-    run_fetcher(runtime_config, ha_headers)
+    logger.info("Scheduled fetcher to run every %s minutes", interval_minutes)
 
-    # Start scheduler (blocking)
-    scheduler.start()
+    # Single periodic job: a monotonic sleep loop is much lighter than a
+    # scheduler framework and cannot drift with wall-clock adjustments.
+    interval_seconds = interval_minutes * 60
+    next_run = time.monotonic()
+    while True:
+        run_fetcher(session, runtime_config, ha_headers)
+        next_run += interval_seconds
+        time.sleep(max(0, next_run - time.monotonic()))
@@ -1,5 +1,6 @@
 import argparse
 import asyncio
+import functools
 from playwright.async_api import async_playwright
 import os
 import io
@@ -7,6 +8,7 @@ import logging
 from datetime import datetime, timedelta
 from PIL import Image, ImageDraw, ImageFont
 import json
+import shutil
 import subprocess
 import pytz
 from apscheduler.schedulers.blocking import BlockingScheduler
@@ -36,6 +38,10 @@ FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
 TIMEOUT_MS = 60000  # 60 seconds
 FETCH_RETRY_COUNT = int(os.environ.get("FETCH_RETRY_COUNT", "3"))
 FETCH_RETRY_DELAY_SECONDS = int(os.environ.get("FETCH_RETRY_DELAY_SECONDS", "10"))
+# Resource types the CEHQ page loads but the chart export does not need.
+# The graph and its PNG/CSV downloads only depend on the document, the
+# Highcharts scripts, and XHR data.
+BLOCKED_RESOURCE_TYPES = ("font", "image", "stylesheet", "media", "other")
 
 # Flood Prediction Settings
 FLOW_WARNING_THRESHOLD = float(
@@ -83,6 +89,8 @@ logger = logging.getLogger(__name__)
 
 # Quebec Timezone
 QUEBEC_TZ = pytz.timezone("America/Montreal")
+# CEHQ forecast CSV timestamps are fixed EST; build the tz object once
+CEHQ_TZ = pytz.timezone("EST")
 
 
 # --- HA TOKEN LOADER ---
@@ -180,11 +188,39 @@ def build_runtime_config(args):
 
 
 # --- HELPER FUNCTIONS ---
+# Parsed contents of LAST_SUCCESS_FILE; write-through cache so the stale
+# check does not read and re-parse the same file twice per tick.
+_status_cache = None
+
+
+def _write_status_data(data):
+    global _status_cache
+    _status_cache = dict(data)
+    tmp_path = LAST_SUCCESS_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, LAST_SUCCESS_FILE)
+    # The web copy is byte-identical; hard-link it instead of serializing twice.
+    try:
+        os.remove(LAST_SUCCESS_WEB_FILE)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(LAST_SUCCESS_FILE, LAST_SUCCESS_WEB_FILE)
+    except OSError:
+        # /opt and the nginx root can be separate volumes; fall back to a copy.
+        shutil.copyfile(LAST_SUCCESS_FILE, LAST_SUCCESS_WEB_FILE)
+
+
 def load_status_data():
+    global _status_cache
+    if _status_cache is not None:
+        return dict(_status_cache)
     if os.path.exists(LAST_SUCCESS_FILE):
         try:
             with open(LAST_SUCCESS_FILE, "r") as f:
-                return json.load(f)
+                _status_cache = json.load(f)
+            return dict(_status_cache)
         except Exception as e:
             logger.error(f"Error reading status file: {e}")
     return {}
@@ -199,10 +235,7 @@ def save_last_success_time():
         "timezone": "America/Montreal",
         "stale_applied": False,
     }
-    with open(LAST_SUCCESS_FILE, "w") as f:
-        json.dump(data, f)
-    with open(LAST_SUCCESS_WEB_FILE, "w") as f:
-        json.dump(data, f)
+    _write_status_data(data)
     logger.info("Success timestamp updated.")
 
 
@@ -211,10 +244,14 @@ def mark_stale_applied():
     if not data.get("last_successful_run"):
         return
     data["stale_applied"] = True
-    with open(LAST_SUCCESS_FILE, "w") as f:
-        json.dump(data, f)
-    with open(LAST_SUCCESS_WEB_FILE, "w") as f:
-        json.dump(data, f)
+    _write_status_data(data)
+
+
+@functools.lru_cache(maxsize=64)
+def _load_font(size):
+    """FreeType re-parses the TTF on every truetype() call; cache per size
+    so the overlay sizing loop only pays for faces it has not seen."""
+    return ImageFont.truetype(FONT_PATH, size)
 
 
 def add_warning_overlay(img_path, warning_text):
@@ -226,25 +263,26 @@ def add_warning_overlay(img_path, warning_text):
         img_obj = Image.open(img_path)
         draw = ImageDraw.Draw(img_obj)
 
-        current_font_size = int(img_obj.width * FONT_SIZE_BASE_RATIO_WIDTH)
-        font = None
-        while current_font_size > 5:
-            try:
-                font = ImageFont.truetype(FONT_PATH, current_font_size)
-            except IOError:
-                font = ImageFont.load_default()
-            try:
-                text_bbox = draw.textbbox((0, 0), warning_text, font=font)
-                text_width = text_bbox[2] - text_bbox[0]
-                text_height = text_bbox[3] - text_bbox[1]
-            except AttributeError:
-                text_width, text_height = draw.textsize(warning_text, font=font)
-            if text_width <= img_obj.width * WARNING_TEXT_MAX_WIDTH_RATIO:
-                break
-            current_font_size -= 2
-
-        if font is None:
+        # Text width scales ~linearly with font size, so measure the string
+        # once at a reference size and solve for the largest size that fits
+        # instead of shrinking step by step.
+        max_font_size = int(img_obj.width * FONT_SIZE_BASE_RATIO_WIDTH)
+        target_width = img_obj.width * WARNING_TEXT_MAX_WIDTH_RATIO
+        try:
+            ref_size = 100
+            ref_width = draw.textlength(warning_text, font=_load_font(ref_size))
+            fitted_size = (
+                int(ref_size * target_width / ref_width) if ref_width else max_font_size
+            )
+            font = _load_font(max(6, min(max_font_size, fitted_size)))
+        except IOError:
             font = ImageFont.load_default()
+        try:
+            text_bbox = draw.textbbox((0, 0), warning_text, font=font)
+            text_width = text_bbox[2] - text_bbox[0]
+            text_height = text_bbox[3] - text_bbox[1]
+        except AttributeError:
+            text_width, text_height = draw.textsize(warning_text, font=font)
         x = (img_obj.width - text_width) / 2
         y = int(img_obj.height * 0.02)
         padding = 10
@@ -260,26 +298,65 @@ def add_warning_overlay(img_path, warning_text):
             fill=(0, 0, 0, 128),
         )
         img_obj.paste(overlay, (0, 0), overlay)
-        stroke_width = 2
-        for dx in range(-stroke_width, stroke_width + 1):
-            for dy in range(-stroke_width, stroke_width + 1):
-                if dx != 0 or dy != 0:
-                    draw.text((x + dx, y + dy), warning_text, font=font, fill=(0, 0, 0))
-        draw.text((x, y), warning_text, font=font, fill=TEXT_COLOR)
+        draw.text(
+            (x, y),
+            warning_text,
+            font=font,
+            fill=TEXT_COLOR,
+            stroke_width=2,
+            stroke_fill=(0, 0, 0),
+        )
         img_obj.save(img_path)
         logger.info("Warning overlay saved successfully.")
     except Exception as e:
         logger.error(f"Failed to add overlay: {e}")
 
 
-def process_and_save_image(image_data_buffer):
+def _compress_png(resized_img, compressed_path):
+    """Palette-compress the resized graph PNG.
+
+    Prefers pngquant (optimized C quantizer, faster and smaller output than
+    Pillow's MEDIANCUT); falls back to the Pillow path when the binary is
+    not installed or fails.
     """
-    Accepts a BytesIO buffer (RAM) instead of a file path.
-    Saves only the target artifacts to disk.
+    if shutil.which("pngquant"):
+        tmp_path = compressed_path + ".tmp.png"
+        resized_img.save(tmp_path, "PNG")
+        try:
+            subprocess.run(
+                [
+                    "pngquant",
+                    "--force",
+                    "--speed",
+                    "1",
+                    "--output",
+                    compressed_path,
+                    str(PNG_PALETTE_COLORS),
+                    "--",
+                    tmp_path,
+                ],
+                check=True,
+            )
+            return
+        except (subprocess.CalledProcessError, OSError) as e:
+            logger.warning(f"pngquant failed ({e}); falling back to Pillow quantize.")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    paletted_img = resized_img.quantize(
+        colors=PNG_PALETTE_COLORS, method=Image.Quantize.MEDIANCUT
+    )
+    paletted_img.save(compressed_path, "PNG", optimize=True)
+
+
+def process_and_save_image(image_source):
+    """
+    Accepts a file path or file-like object; Pillow reads lazily from
+    either. Saves only the target artifacts to disk.
     """
     try:
-        # Load directly from memory
-        img = Image.open(image_data_buffer)
+        img = Image.open(image_source)
 
         # 1. Crop
         cropped_img = img.crop((0, 0, img.width, img.height - CROP_BOTTOM_PIXELS))
@@ -296,12 +373,13 @@ def process_and_save_image(image_data_buffer):
             target_width / cropped_img.width, target_height / cropped_img.height
         )
         new_size = (int(cropped_img.width * scale), int(cropped_img.height * scale))
-        resized_img = cropped_img.resize(new_size, Image.Resampling.LANCZOS)
-
-        paletted_img = resized_img.quantize(
-            colors=PNG_PALETTE_COLORS, method=Image.Quantize.MEDIANCUT
+        # reducing_gap lets Pillow do a cheap box-reduce prepass before the
+        # LANCZOS convolution, cutting most of the resize cost on large inputs
+        resized_img = cropped_img.resize(
+            new_size, Image.Resampling.LANCZOS, reducing_gap=2.0
         )
-        paletted_img.save(compressed_path, "PNG", optimize=True)
+
+        _compress_png(resized_img, compressed_path)
         resized_img.save(jpg_path, "JPEG", quality=JPEG_QUALITY)
 
         # 3. Symlink
@@ -471,7 +549,6 @@ def process_csv_prediction(csv_buffer):
     raw_events = []
     current_event = None
 
-    CEHQ_TZ = pytz.timezone("EST")
     now_utc = datetime.now(pytz.utc)
     now_local = datetime.now(QUEBEC_TZ)
 
@@ -629,7 +706,6 @@ def process_smart_alerts(forecast_payload):
     end_of_lookahead_window = (
         now_local + timedelta(days=SMART_ALERT_NEW_LOOKAHEAD_DAYS)
     ).replace(hour=23, minute=59, second=59)
-    CEHQ_TZ = pytz.timezone("EST")
 
     def parse_time(t_str):
         return CEHQ_TZ.localize(
@@ -697,143 +773,165 @@ def process_smart_alerts(forecast_payload):
     return alerts_payload, next_memory, new_alert_id
 
 
+async def _abort_non_essential(route):
+    request = route.request
+    if (
+        request.resource_type in BLOCKED_RESOURCE_TYPES
+        or "google-analytics" in request.url
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 # --- MAIN PLAYWRIGHT FETCH ROUTINE ---
 async def download_graph_png(runtime_config, ha_headers):
     url = runtime_config["graph_url"]
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    for attempt in range(1, FETCH_RETRY_COUNT + 1):
-        try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch()
-
-                # User Agent Spoofing
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                )
-
-                page = await context.new_page()
-                page.set_default_timeout(TIMEOUT_MS)
-
-                logger.info(f"Navigating to {url}...")
-
-                await page.goto(url)
-                await page.wait_for_selector("#container3", state="visible")
-                logger.info("Graph container visible.")
-
-                # --- 1. DOWNLOAD PNG ---
-                menu_btn_sel = 'button.highcharts-a11y-proxy-element[aria-label*="Détail des prochains jours"]'
-                menu_button = await page.wait_for_selector(
-                    menu_btn_sel, state="visible"
-                )
-
-                await page.wait_for_timeout(1000)
-                await menu_button.click()
-                logger.info("Menu clicked.")
-
-                dl_text = "Télécharger l'image PNG"
-                await page.wait_for_selector(f"text={dl_text}")
-
-                await page.wait_for_timeout(1000)
+    async with async_playwright() as p:
+        # Chromium cold-start dominates the cost of a retry, so launch the
+        # browser and context once and only recreate the page per attempt.
+        browser = await p.chromium.launch()
 
-                async with page.expect_download(timeout=TIMEOUT_MS) as download_info:
-                    logger.info(f"Clicking '{dl_text}'...")
-                    await page.click(f"text={dl_text}", force=True)
+        # User Agent Spoofing
+        context = await browser.new_context(
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        )
+        await context.route("**/*", _abort_non_essential)
 
-                download = await download_info.value
+        try:
+            for attempt in range(1, FETCH_RETRY_COUNT + 1):
+                page = None
+                try:
+                    page = await context.new_page()
+                    page.set_default_timeout(TIMEOUT_MS)
 
-                # --- IN-MEMORY PROCESSING ---
-                # Playwright saves to a system temp file first (e.g., /tmp/...).
-                # We read that directly into RAM. Playwright cleans it up automatically on browser.close().
-                temp_path = await download.path()
-                logger.info(
-                    f"Download acquired (temp path: {temp_path}). Loading into RAM..."
-                )
+                    logger.info(f"Navigating to {url}...")
 
-                with open(temp_path, "rb") as f:
-                    memory_buffer = io.BytesIO(f.read())
+                    await page.goto(url)
+                    await page.wait_for_selector("#container3", state="visible")
+                    logger.info("Graph container visible.")
 
-                # Pass the RAM buffer to the processor
-                if process_and_save_image(memory_buffer):
-                    save_last_success_time()
-                    backup_if_missing()
+                    # --- 1. DOWNLOAD PNG ---
+                    menu_btn_sel = 'button.highcharts-a11y-proxy-element[aria-label*="Détail des prochains jours"]'
+                    menu_button = await page.wait_for_selector(
+                        menu_btn_sel, state="visible"
+                    )
 
-                if PREDICTION_PROCESSING_ENABLED:
-                    # --- 2. DOWNLOAD CSV ---
-                    logger.info("Re-opening menu to download CSV...")
-                    # The menu closes after the first click, so we open it again
+                    # Wait for the button to settle instead of sleeping a
+                    # fixed second; Highcharts repositions its a11y proxies
+                    # while the chart lays out.
+                    await menu_button.scroll_into_view_if_needed()
+                    await menu_button.wait_for_element_state("stable")
                     await menu_button.click()
+                    logger.info("Menu clicked.")
+
+                    dl_text = "Télécharger l'image PNG"
+                    await page.wait_for_selector(f"text={dl_text}", state="visible")
+
+                    async with page.expect_download(
+                        timeout=TIMEOUT_MS
+                    ) as download_info:
+                        logger.info(f"Clicking '{dl_text}'...")
+                        await page.click(f"text={dl_text}", force=True)
+
+                    download = await download_info.value
+
+                    # Playwright saves to a system temp file first (e.g., /tmp/...)
+                    # and cleans it up automatically on browser.close(). Pillow
+                    # reads straight from that path, so no RAM copy is needed.
+                    temp_path = await download.path()
+                    logger.info(f"Download acquired (temp path: {temp_path}).")
+
+                    if process_and_save_image(temp_path):
+                        save_last_success_time()
+                        backup_if_missing()
+
+                    if PREDICTION_PROCESSING_ENABLED:
+                        # --- 2. DOWNLOAD CSV ---
+                        logger.info("Re-opening menu to download CSV...")
+                        # The menu closes after the first click, so we open it again
+                        await menu_button.click()
+
+                        csv_text = "Télécharger en CSV"
+                        await page.wait_for_selector(
+                            f"text={csv_text}", state="visible"
+                        )
 
-                    csv_text = "Télécharger en CSV"
-                    await page.wait_for_selector(f"text={csv_text}", state="visible")
-                    await page.wait_for_timeout(1000)
-
-                    async with page.expect_download(timeout=TIMEOUT_MS) as csv_info:
-                        logger.info(f"Clicking '{csv_text}'...")
-                        await page.click(f"text={csv_text}", force=True)
-
-                    csv_download = await csv_info.value
-                    csv_temp_path = await csv_download.path()
+                        async with page.expect_download(timeout=TIMEOUT_MS) as csv_info:
+                            logger.info(f"Clicking '{csv_text}'...")
+                            await page.click(f"text={csv_text}", force=True)
 
-                    logger.info("CSV downloaded. Parsing prediction data...")
-                    with open(csv_temp_path, "rb") as f:
-                        csv_buffer = io.BytesIO(f.read())
+                        csv_download = await csv_info.value
+                        csv_temp_path = await csv_download.path()
 
-                    # 1. Parse the CSV
-                    forecast_payload = process_csv_prediction(csv_buffer)
+                        logger.info("CSV downloaded. Parsing prediction data...")
+                        with open(csv_temp_path, "rb") as f:
+                            csv_buffer = io.BytesIO(f.read())
 
-                    # 2. Push RAW forecasts to the original sensor
-                    send_forecast_to_home_assistant(
-                        forecast_payload, runtime_config, ha_headers
-                    )
+                        # 1. Parse the CSV
+                        forecast_payload = process_csv_prediction(csv_buffer)
 
-                    if SMART_ALERTS_ENABLED:
-                        # 3. Process memory and generate the filtered payload
-                        alerts_payload, next_memory, new_alert_id = (
-                            process_smart_alerts(forecast_payload)
+                        # 2. Push RAW forecasts to the original sensor
+                        send_forecast_to_home_assistant(
+                            forecast_payload, runtime_config, ha_headers
                         )
 
-                        # 4. Push alerts to the NEW sensor and save memory
-                        send_alerts_to_home_assistant(
-                            alerts_payload,
-                            next_memory,
-                            new_alert_id,
-                            runtime_config,
-                            ha_headers,
-                        )
+                        if SMART_ALERTS_ENABLED:
+                            # 3. Process memory and generate the filtered payload
+                            alerts_payload, next_memory, new_alert_id = (
+                                process_smart_alerts(forecast_payload)
+                            )
+
+                            # 4. Push alerts to the NEW sensor and save memory
+                            send_alerts_to_home_assistant(
+                                alerts_payload,
+                                next_memory,
+                                new_alert_id,
+                                runtime_config,
+                                ha_headers,
+                            )
+                        else:
+                            logger.info(
+                                "Smart alerts disabled (SMART_ALERTS_ENABLED=false)."
+                            )
                     else:
                         logger.info(
-                            "Smart alerts disabled (SMART_ALERTS_ENABLED=false)."
+                            "Prediction processing disabled because PREDICTION_THRESHOLD_M3S=0."
                         )
-                else:
-                    logger.info(
-                        "Prediction processing disabled because PREDICTION_THRESHOLD_M3S=0."
-                    )
 
-                await browser.close()
-                return
+                    return
 
-        except Exception as e:
-            if attempt < FETCH_RETRY_COUNT:
-                logger.warning(
-                    "Operation failed (attempt %s/%s): %s. Retrying in %ss...",
-                    attempt,
-                    FETCH_RETRY_COUNT,
-                    e,
-                    FETCH_RETRY_DELAY_SECONDS,
-                )
-                try:
-                    await asyncio.sleep(FETCH_RETRY_DELAY_SECONDS)
-                except Exception:
-                    pass
-            else:
-                logger.error(
-                    "Operation failed after %s attempts: %s",
-                    FETCH_RETRY_COUNT,
-                    e,
-                    exc_info=True,
-                )
-                check_and_overlay_stale_data()
+                except Exception as e:
+                    if attempt < FETCH_RETRY_COUNT:
+                        logger.warning(
+                            "Operation failed (attempt %s/%s): %s. Retrying in %ss...",
+                            attempt,
+                            FETCH_RETRY_COUNT,
+                            e,
+                            FETCH_RETRY_DELAY_SECONDS,
+                        )
+                        try:
+                            await asyncio.sleep(FETCH_RETRY_DELAY_SECONDS)
+                        except Exception:
+                            pass
+                    else:
+                        logger.error(
+                            "Operation failed after %s attempts: %s",
+                            FETCH_RETRY_COUNT,
+                            e,
+                            exc_info=True,
+                        )
+                        check_and_overlay_stale_data()
+                finally:
+                    if page is not None:
+                        try:
+                            await page.close()
+                        except Exception:
+                            pass
+        finally:
+            await browser.close()
 
 
 if __name__ == "__main__":